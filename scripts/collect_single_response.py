@@ -8,18 +8,22 @@
     a single question and the 'patient' will give a single response."""
 
 from typing import Callable, Dict, List, Any, Tuple, Sequence
-import copy
-import tqdm
-import json
+import argparse
+import asyncio
+import hashlib
+import tqdm.asyncio
 
 import os
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".openai_cache")
 
+import diskcache
+import httpx
 import openai
-openai.organization = os.getenv("OPENAI_ORGANIZATION")
-openai.api_key = os.getenv("OPENAI_API_KEY")
+import orjson
 
 
+MAX_CONCURRENCY = 16
 STOP_SEQ = ["Therapist:", "Patient:"]
 TEMPLATE = """
 Below is a conversation between a patient and a psychotherapist.
@@ -28,6 +32,11 @@ Patient:
 """.strip()
 
 
+def hash_params(params: Dict[str, Any]) -> str:
+    """Return a stable digest of a request's parameters, insensitive to key order."""
+    return hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()
+
+
 def get_questions(path: str = "") -> Sequence[Tuple[int, str]]:
     """Return a set of questions for the simulated patient."""
     
@@ -82,29 +91,91 @@ def get_tuned_params(path: str = "") -> Sequence[Tuple[int, Dict[str, Any]]]:
     for param, vals in tune_params.items():
         for val in vals:
             if val != base_params[param]:
-                new_params = copy.deepcopy(base_params)
-                new_params[param] = val
-                list_params.append(new_params)
+                list_params.append({**base_params, param: val})
+
+    # Drop configurations that collide across tuned dimensions
+    list_params = list({hash_params(p): p for p in list_params}.values())
     return list(enumerate(list_params))
 
 
-if __name__ == "__main__":
+async def collect_single(client: openai.AsyncOpenAI,
+                         semaphore: asyncio.Semaphore,
+                         cache: diskcache.Cache,
+                         replay: bool,
+                         qid: int,
+                         question: str,
+                         cid: int,
+                         config: Dict[str, Any]) -> Dict[str, Any]:
+    """Sample the completions for a single question under a single configuration.
+        The semaphore caps the number of requests in flight. Every completion
+        is written to the cache, but it is served from the cache only if the 
+        request is deterministic (zero temperature) or `replay` is set."""
+
+    config = {**config, "prompt": TEMPLATE.format(question=question)}
+
+    key = hash_params(config)
+    use_cache = replay or config["temperature"] == 0
+    completion = cache.get(key) if use_cache else None
+
+    if completion is None:
+        async with semaphore:
+            response = await client.completions.create(**config)
+
+        completion = [c.text.strip() for c in response.choices]
+        cache.set(key, completion)
+
+    # Save the response and the corresponding configuration
+    config.update({"qid": qid,
+                   "cid": cid,
+                   "question": question,
+                   "completion": completion})
+    return config
+
+
+async def collect(max_concurrency: int = MAX_CONCURRENCY, 
+                  replay: bool = False) -> List[Dict[str, Any]]:
+    """Collect the responses for all question-configuration pairs. The pairs are 
+        independent of each other, so they are dispatched concurrently and 
+        sorted back into (question, configuration) order once all are done."""
+
+    # One keep-alive pool shared by every request, sized to the concurrency cap
+    limits = httpx.Limits(max_keepalive_connections=max_concurrency, 
+                          max_connections=max_concurrency)
+    with diskcache.Cache(CACHE_DIR) as cache:
+        async with httpx.AsyncClient(limits=limits, http2=True, timeout=60) as http_client, \
+                   openai.AsyncOpenAI(organization=os.getenv("OPENAI_ORGANIZATION"),
+                                      api_key=os.getenv("OPENAI_API_KEY"),
+                                      http_client=http_client) as client:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            tasks = [collect_single(client, semaphore, cache, replay, qid, question, cid, config)
+                     for qid, question in get_questions()
+                     for cid, config in get_tuned_params()]
+
+            responses = [await r for r in tqdm.asyncio.tqdm.as_completed(tasks, desc="All requests")]
+    return sorted(responses, key=lambda r: (r["qid"], r["cid"]))
+
+
+def get_parser():
+
+    parser = argparse.ArgumentParser(description="Collect single responses over the hyperparameter grid")
+    parser.add_argument("--max-concurrency", "-c", type=int, default=MAX_CONCURRENCY,
+                        help="Maximum number of requests in flight")
+    parser.add_argument("--replay", action="store_true",
+                        help="Serve stochastic (non-zero temperature) requests from the cache filled "
+                             "by earlier runs, e.g. to resume a crashed sweep")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent the output JSON for human inspection")
+    return parser
+
 
-    responses = []
-    for qid, question in tqdm.tqdm(get_questions(), desc="All questions", position=0):
-        prompt = TEMPLATE.format(question=question)
+if __name__ == "__main__":
 
-        for cid, config in tqdm.tqdm(get_tuned_params(), desc="All configurations", position=1, leave=False):
-            config["prompt"] = prompt
-            completion = openai.Completion.create(**config)
+    parser = get_parser()
+    args = parser.parse_args()
 
-            # Save the response and the corresponding configuration
-            config.update({"qid": qid,
-                           "cid": cid,
-                           "question": question,
-                           "completion": [c["text"].strip() for c in completion["choices"]]})
-            responses.append(config)
+    responses = asyncio.run(collect(args.max_concurrency, args.replay))
 
-    path = os.path.join(DATA_DIR, "conversations", f"{config['model']}-single-response.json")
-    with open(path, "w") as f:
-        json.dump(responses, f, indent=4)
+    path = os.path.join(DATA_DIR, "conversations", f"{responses[0]['model']}-single-response.json")
+    option = orjson.OPT_INDENT_2 if args.pretty else 0
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(responses, option=option))
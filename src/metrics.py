@@ -1,10 +1,11 @@
 # %%
 from typing import List, Dict, Any, Callable, Union
-from itertools import combinations
+from functools import lru_cache
+from collections import defaultdict
 
 import re
 
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 
 from nltk import word_tokenize
 from nltk.corpus import stopwords
@@ -14,6 +15,23 @@ from empath import Empath
 from sentence_transformers import SentenceTransformer
 
 
+_PUNCT = re.compile(r"[^\w\s\d]")
+
+
+@lru_cache(maxsize=1)
+def _empath() -> Empath:
+    """Shared Empath instance; loading the lexicon from disk is expensive.
+    """
+    return Empath()
+
+
+@lru_cache(maxsize=1)
+def _stopwords() -> frozenset:
+    """Shared English stopword set from the NLTK corpus.
+    """
+    return frozenset(stopwords.words("english"))
+
+
 class SentenceBERTDiversity:
     """Use SentenceBERT to compute the average pairwise cosine similarity 
         between a set of utterances. This is used to measure the 
@@ -43,13 +61,26 @@ class SentenceBERTDiversity:
         if isinstance(utterances[0], str):
             utterances = [utterances]
 
-        return [self._analyze(s) for s in utterances]
-
-    def _analyze(self, utterances: List[str]) -> float:
-        """Compute the SentenceBERT diversity metric for a single utterance set.
+        # Encode all sets in one call, then slice out each set
+        flat, offsets = [], [0]
+        for s in utterances:
+            flat.extend(s)
+            offsets.append(len(flat))
+
+        embeddings = self._model.encode(flat, 
+                                        batch_size=64,
+                                        normalize_embeddings=True, 
+                                        convert_to_numpy=True)
+        return [self._analyze(embeddings[i:j]) for i, j in zip(offsets[:-1], offsets[1:])]
+
+    def _analyze(self, embeddings: np.ndarray) -> float:
+        """Compute the SentenceBERT diversity metric for a single utterance set
+            given its normalized embeddings.
         """
-        pairs = list(combinations(self._model.encode(utterances), 2))
-        return 1 - cosine_similarity(*zip(*pairs)).mean()
+        # Mean of the off-diagonal entries of the cosine similarity matrix
+        n = embeddings.shape[0]
+        sim = embeddings @ embeddings.T
+        return 1 - (sim.sum() - np.trace(sim)) / (n * (n - 1))
 
 
 class Length:
@@ -88,14 +119,23 @@ class EmpathNegativity:
                  normalize: bool = True) -> None:
         """Initialize the Empath polarity metric.
         """
-        self._empath     = Empath()
+        self._empath     = _empath()
         self._normalize  = normalize
         self._categories = categories or ["negative_emotion",
                                           "aggression",
                                           "hate"]
 
-        self._stopwords = set(stopwords.words("english"))
-        self._lemmatize = WordNetLemmatizer().lemmatize
+        self._stopwords = _stopwords()
+
+        # Empath rebuilds the term-to-category index over `categories` on every 
+        #   call; build it once here (the shared lexicon itself is left intact)
+        self._index = defaultdict(list)
+        for category in self._categories:
+            for term in self._empath.cats[category]:
+                self._index[term].append(category)
+
+        # Vocabulary is heavily repeated across utterances, so memoize lemma lookups
+        self._lemmatize = lru_cache(maxsize=None)(WordNetLemmatizer().lemmatize)
 
     @property
     def name(self) -> str:
@@ -119,16 +159,23 @@ class EmpathNegativity:
     def _analyze(self, utterance: str) -> float:
         """Compute the Empath polarity metric for a single utterance.
         """
-        scores = self._empath.analyze(self._preprocess(utterance),
-                                      categories=self._categories, 
-                                      normalize=self._normalize)
+        tokens = self._preprocess(utterance).split()
+
+        # Same counting as `Empath.analyze`, against the prebuilt index
+        scores = dict.fromkeys(self._categories, 0.0)
+        for token in tokens:
+            for category in self._index.get(token, []):
+                scores[category] += 1.0
+
+        if self._normalize:
+            scores = {k: v / max(len(tokens), 1) for k, v in scores.items()}
         return sum(scores.values()) / len(scores)
 
     def _preprocess(self, utterance: str) -> str:
         """Preprocess an utterance. Remove stopwords, punctuations, 
             and lemmatize to base form.
         """
-        utterance = re.sub(r"[^\w\s\d]", "", utterance)
+        utterance = _PUNCT.sub("", utterance)
 
         # Remove stopwords and lemmatize
         utterance = " ".join([self._lemmatize(word) for word in word_tokenize(utterance) 
@@ -1,11 +1,27 @@
-from typing import Sequence
+from typing import Sequence, Tuple, Union
 import numpy as np
 
 
 EPS = np.finfo(float).eps
 
 
-def pooled_stdev(x: Sequence[float], y: Sequence[float]) -> float:
+def _mean_var(x: np.ndarray, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sample mean and unbiased variance along `axis`, reusing the mean
+        for the variance instead of reducing over `x` again."""
+
+    m = x.mean(axis=axis, keepdims=True)
+    v = np.square(x - m).sum(axis=axis) / (x.shape[axis] - 1)
+    return np.squeeze(m, axis=axis), v
+
+
+def _pooled_stdev_stats(n_x: int, v_x: np.ndarray, n_y: int, v_y: np.ndarray) -> np.ndarray:
+    """Pooled standard deviation from precomputed sample sizes and variances."""
+
+    n = n_x + n_y - 2
+    return np.sqrt(((n_x - 1) / n) * v_x + ((n_y - 1) / n) * v_y)
+
+
+def pooled_stdev(x: Sequence[float], y: Sequence[float], axis: int = -1) -> Union[float, np.ndarray]:
     """Calculate the pooled standard deviation.
 
     Parameters
@@ -14,24 +30,28 @@ def pooled_stdev(x: Sequence[float], y: Sequence[float]) -> float:
         The first array of values.
     y : array-like
         The second array of values.
+    axis : int, optional
+        The axis holding the samples. Any other axes index independent
+        comparisons, e.g. 2-D inputs give one value per row. Default -1.
 
     Returns
     -------
-    s : float
+    s : float or ndarray
         The pooled standard deviation.
     """
 
-    x = np.asarray(x)
-    y = np.asarray(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
 
     # Compute the pooled standard deviation
-    n = x.size + y.size - 2
-    s = np.sqrt(((x.size - 1) / n) * x.var(ddof=1) + ((y.size - 1) / n) * y.var(ddof=1))
+    _, v_x = _mean_var(x, axis)
+    _, v_y = _mean_var(y, axis)
+    s = _pooled_stdev_stats(x.shape[axis], v_x, y.shape[axis], v_y)
 
     return s
 
 
-def cohen_d(x: Sequence[float], y: Sequence[float]) -> float:
+def cohen_d(x: Sequence[float], y: Sequence[float], axis: int = -1) -> Union[float, np.ndarray]:
     """Calculate Cohen's d.
 
     Parameters
@@ -40,10 +60,13 @@ def cohen_d(x: Sequence[float], y: Sequence[float]) -> float:
         The first array of values.
     y : array-like
         The second array of values.
+    axis : int, optional
+        The axis holding the samples. Any other axes index independent
+        comparisons, e.g. 2-D inputs give one value per row. Default -1.
 
     Returns
     -------
-    d : float
+    d : float or ndarray
         Cohen's d.
 
     Examples
@@ -54,14 +77,17 @@ def cohen_d(x: Sequence[float], y: Sequence[float]) -> float:
     1.0
     """
 
-    x = np.asarray(x)
-    y = np.asarray(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
 
-    d = (x.mean() - y.mean()) / (pooled_stdev(x, y) + EPS)
+    m_x, v_x = _mean_var(x, axis)
+    m_y, v_y = _mean_var(y, axis)
+
+    d = (m_x - m_y) / (_pooled_stdev_stats(x.shape[axis], v_x, y.shape[axis], v_y) + EPS)
     return d
 
 
-def norm_diff_stdev(x: Sequence[float], y: Sequence[float]) -> float:
+def norm_diff_stdev(x: Sequence[float], y: Sequence[float], axis: int = -1) -> Union[float, np.ndarray]:
     """Calculate the normalized difference in standard deviation.
 
     Parameters
@@ -70,15 +96,21 @@ def norm_diff_stdev(x: Sequence[float], y: Sequence[float]) -> float:
         The first array of values.
     y : array-like
         The second array of values.
+    axis : int, optional
+        The axis holding the samples. Any other axes index independent
+        comparisons, e.g. 2-D inputs give one value per row. Default -1.
 
     Returns
     -------
-    d : float
+    d : float or ndarray
         The normalized difference in standard deviation.
     """
 
-    x = np.asarray(x)
-    y = np.asarray(y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    _, v_x = _mean_var(x, axis)
+    _, v_y = _mean_var(y, axis)
 
-    d = (x.std(ddof=1) - y.std(ddof=1)) / (pooled_stdev(x, y) + EPS)
+    d = (np.sqrt(v_x) - np.sqrt(v_y)) / (_pooled_stdev_stats(x.shape[axis], v_x, y.shape[axis], v_y) + EPS)
     return d